@@ -4,4 +4,11 @@ __version__ = "0.1.0"
 
 from .client import QwenTTSClient
 
-__all__ = ["QwenTTSClient"]
\ No newline at end of file
+__all__ = ["QwenTTSClient"]
+
+try:
+    from .async_client import AsyncQwenTTSClient
+    __all__.append("AsyncQwenTTSClient")
+except ImportError:
+    # aiohttp / aiohttp-sse-client 未安装时仅提供同步客户端
+    pass
\ No newline at end of file
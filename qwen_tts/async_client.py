@@ -0,0 +1,286 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, AsyncGenerator
+import logging
+
+import aiohttp
+from aiohttp_sse_client.client import EventSource
+
+from .client import (
+    DEFAULT_BASE_URL,
+    DEFAULT_VOICE,
+    DEFAULT_LANGUAGE,
+    DEFAULT_FN_INDEX,
+    DEFAULT_TRIGGER_ID,
+    DEFAULT_TIMEOUT_JOIN,
+    DEFAULT_TIMEOUT_TTS,
+    DEFAULT_USER_AGENT,
+    QwenTTSClient,
+    _json_loads,
+    _VOICES_SET,
+    _LANGUAGES_SET,
+)
+
+logger = logging.getLogger(__name__)
+
+# 批量合成时默认的并发任务数（受服务端队列限制，不宜过大）
+DEFAULT_CONCURRENCY = 4
+
+
+class AsyncQwenTTSClient:
+    """
+    QwenTTSClient 的 asyncio 版本，基于 aiohttp 实现。
+
+    所有 TTS 任务共享同一个 `aiohttp.ClientSession`（单条 TCP/TLS 连接复用），
+    `atts_batch` 通过 `asyncio.Semaphore` 控制并发，使 N 个任务的总耗时
+    接近 max(单任务耗时) 而非 Σ(单任务耗时)。
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL):
+        """
+        初始化 AsyncQwenTTSClient 客户端
+
+        Args:
+            base_url (str): TTS 服务的基础 URL 地址
+        """
+        self.base_url = base_url.rstrip('/')
+        # 会话延迟创建：aiohttp.ClientSession 必须在事件循环内构造
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """
+        按需创建并复用 aiohttp 会话（连接池在所有请求间共享）
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                keepalive_timeout=75
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "User-Agent": DEFAULT_USER_AGENT,
+                    "Accept": "*/*"
+                }
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        关闭底层 aiohttp 会话，释放连接池
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncQwenTTSClient":
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def _join_queue(self,
+                          text: str,
+                          voice: str = DEFAULT_VOICE,
+                          mode: str = DEFAULT_LANGUAGE,
+                          fn_index: int = DEFAULT_FN_INDEX,
+                          trigger_id: int = DEFAULT_TRIGGER_ID,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        通过向 /gradio_api/queue/join 发送 POST 请求加入 TTS 生成队列（异步版本）
+
+        `timeout` 约束加入阶段的墙钟时间，供 `atts` 把总预算按剩余量分摊到各阶段。
+        """
+        # 与同步版一致的 O(1) 本地校验，避免把非法参数发给服务端再等它报错
+        if voice not in _VOICES_SET:
+            raise ValueError(f"不支持的语音选项: {voice!r}，可选值见 SUPPORTS_VOICES")
+        if mode not in _LANGUAGES_SET:
+            raise ValueError(f"不支持的语言选项: {mode!r}，可选值见 SUPPORTS_LANGUAGES")
+
+        session_hash = QwenTTSClient._generate_session_hash()
+        url = f"{self.base_url}/gradio_api/queue/join"
+
+        payload = {
+            "data": [text, voice, mode],
+            "event_data": None,
+            "fn_index": fn_index,
+            "trigger_id": trigger_id,
+            "session_hash": session_hash
+        }
+
+        logger.info("正在加入 TTS 队列，处理文本: %s...", text[:20])
+
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT_JOIN
+
+        session = await self._ensure_session()
+        try:
+            async with session.post(
+                url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(sock_connect=5, total=timeout)
+            ) as response:
+                response.raise_for_status()
+                result = _json_loads(await response.read())
+        except asyncio.TimeoutError as e:
+            logger.error("加入队列请求超时: %s", e)
+            raise
+        except aiohttp.ClientError as e:
+            logger.error("加入队列请求失败: %s", e)
+            raise
+
+        result["session_hash"] = session_hash
+
+        logger.info("成功加入 TTS 队列，Hash: %s", session_hash)
+        return result
+
+    async def _poll_data(self,
+                         session_hash: str,
+                         timeout: float = DEFAULT_TIMEOUT_TTS
+                         ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        通过连接到 /gradio_api/queue/data 并使用 SSE 流式传输轮询 TTS 结果（异步版本）
+        """
+        url = f"{self.base_url}/gradio_api/queue/data?session_hash={session_hash}"
+
+        logger.info("开始轮询数据，会话哈希: %s", session_hash)
+
+        session = await self._ensure_session()
+        # 解析失败不逐条打 WARNING（坏流下会刷屏），计数后在结束时汇总一条
+        parse_errors = 0
+        try:
+            async with EventSource(
+                url,
+                session=session,
+                timeout=aiohttp.ClientTimeout(sock_connect=5, total=timeout)
+            ) as event_source:
+                async for event in event_source:
+                    data = event.data
+                    # aiohttp_sse_client 回传 str，编码为 bytes 走 orjson 快路径，
+                    # 与同步客户端的 _parse_sse_stream 保持一致
+                    if isinstance(data, str):
+                        data = data.encode("utf-8")
+                    try:
+                        # ValueError 同时覆盖 json 与 orjson 的解析异常
+                        parsed = _json_loads(data)
+                    except ValueError as e:
+                        parse_errors += 1
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("JSON 解析失败: %s, 原始数据: %s...",
+                                         e, event.data[:50])
+                        yield {"raw": event.data, "error": str(e)}
+                        continue
+
+                    yield parsed
+                    # close_stream 是 Gradio 的终止帧：与同步解析器一致，
+                    # 立即退出以关闭连接，而不是阻塞等服务端断开
+                    if parsed.get("msg") == "close_stream":
+                        break
+        except aiohttp.ClientError as e:
+            logger.error("轮询数据请求失败: %s", e)
+            raise
+        finally:
+            if parse_errors:
+                logger.warning("SSE 流中共有 %d 条事件 JSON 解析失败", parse_errors)
+
+    async def atts(self,
+                   text: str,
+                   voice: str = DEFAULT_VOICE,
+                   mode: str = DEFAULT_LANGUAGE,
+                   timeout: int = DEFAULT_TIMEOUT_TTS) -> Optional[str]:
+        """
+        高级方法，合成文本并直接返回音频文件 URL（异步版本）
+
+        与同步版 `QwenTTSClient.tts` 保持相同的返回约定：成功返回 URL，失败返回 None。
+        `timeout` 是加入队列与轮询两个阶段共享的总墙钟预算（与同步版一致），
+        批量场景下可避免单个慢任务占用信号量超出调用方给定的时间。
+        """
+        start_time = time.time()
+        # 统一截止时刻：各阶段只分得剩余时间
+        deadline = time.monotonic() + timeout
+        events = None
+
+        try:
+            # 1. 加入队列（预算为截止时刻前的剩余时间）
+            join_response = await self._join_queue(
+                text, voice, mode,
+                timeout=max(1.0, deadline - time.monotonic()))
+            session_hash = join_response.get("session_hash")
+
+            if not session_hash:
+                raise ValueError("从加入队列响应中获取会话哈希失败")
+
+            # 2. 轮询结果（扣除加入阶段已消耗的时间）
+            events = self._poll_data(
+                session_hash, max(1.0, deadline - time.monotonic()))
+            async for event in events:
+                if time.monotonic() > deadline:
+                    logger.warning("TTS 合成超时 (%ss)", timeout)
+                    return None
+
+                msg = event.get("msg")
+
+                if msg in ["send_hash", "queue_full", "estimation"]:
+                    # 每帧都会命中的日志，先判级别再格式化参数
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("队列状态: %s - %s", msg, event.get("rank", ""))
+                elif msg == "process_completed":
+                    if event.get("success"):
+                        # 复用同步客户端的快路径提取器，成功路径零临时分配
+                        audio_url = QwenTTSClient._extract_audio_url(event)
+                        if audio_url:
+                            logger.info("TTS 合成成功，耗时: %.2fs", time.time() - start_time)
+                            return f"{audio_url}"
+
+                        logger.warning("成功消息中未找到有效的音频 URL。")
+                        return None
+                    else:
+                        logger.error("TTS 进程执行失败: %s", event.get("output"))
+                        return None
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("TTS 请求发生网络错误: %s", e)
+            return None
+        except ValueError as e:
+            logger.error("TTS 逻辑错误: %s", e)
+            return None
+        except Exception as e:
+            logger.error("文本转语音转换过程中发生未知错误: %s", e, exc_info=True)
+            return None
+        finally:
+            # 提前 return 时显式关闭异步生成器，立即断开 SSE 连接，
+            # 而不是等事件循环某个时刻才运行 async-gen 终结器
+            if events is not None:
+                await events.aclose()
+
+        logger.warning("轮询流异常结束或未在事件中找到音频 URL")
+        return None
+
+    async def atts_batch(self,
+                         texts: List[str],
+                         voice: str = DEFAULT_VOICE,
+                         mode: str = DEFAULT_LANGUAGE,
+                         timeout: int = DEFAULT_TIMEOUT_TTS,
+                         concurrency: int = DEFAULT_CONCURRENCY) -> List[Optional[str]]:
+        """
+        并发合成多段文本，返回与输入顺序一致的音频 URL 列表
+
+        Args:
+            texts (List[str]): 待合成的文本列表
+            voice (str): 语音选项
+            mode (str): 合成模式（语言）
+            timeout (int): 单个任务的超时时间（秒）
+            concurrency (int): 最大并发任务数，由信号量控制
+
+        Returns:
+            List[Optional[str]]: 每段文本对应的音频 URL（失败项为 None）
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(text: str) -> Optional[str]:
+            async with semaphore:
+                return await self.atts(text, voice, mode, timeout)
+
+        return await asyncio.gather(*(_one(text) for text in texts))
@@ -1,20 +1,52 @@
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
-from typing import Generator, Optional, Dict, Any, Tuple
+from typing import Generator, List, Optional, Dict, Any, Tuple
+import secrets
+import hashlib
 import random
-import string
 import logging
-from sseclient import SSEClient # 假设 sseclient 是一个外部库，保持不变
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # --- 配置日志记录系统 (保持不变) ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# --- JSON 编解码 ---
+# 优先使用 orjson（Rust 实现，直接输出/接受 UTF-8 字节，对 CJK 密集的
+# 载荷解码快 2-5 倍）；未安装时回退到标准库，显式 ensure_ascii=False
+# 避免中文被转义成 \uXXXX（正文体积约缩小 3 倍）
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _json_loads = json.loads
+
+# --- 可选的 HTTP/2 传输层 ---
+# httpx 支持 HTTP/2 多路复用：join POST、SSE 轮询与音频下载可共享一条
+# TCP/TLS 连接并行进行；未安装时仅提供 requests 传输
+try:
+    import httpx
+    _HTTPX_ERRORS: Tuple[type, ...] = (httpx.HTTPError,)
+except ImportError:
+    httpx = None
+    _HTTPX_ERRORS = ()
+
 # --- 常量定义 ---
 # 将默认值提取为类属性或常量，增加可维护性
 DEFAULT_BASE_URL = "https://qwen-qwen3-tts-demo.hf.space"
-SUPPORTS_VOICES = [
+# 使用不可变元组对外暴露，调用方无法误改共享状态；frozenset 用于 O(1) 成员校验
+SUPPORTS_VOICES: Tuple[str, ...] = (
 					"Cherry / 芊悦",
 					"Ethan / 晨煦",
 					"Jennifer / 詹妮弗",
@@ -32,10 +64,11 @@ SUPPORTS_VOICES = [
 					"Sunny / 四川-晴儿",
 					"Jada / 上海-阿珍",
 					"Dylan / 北京-晓东"
-				]
+				)
+_VOICES_SET = frozenset(SUPPORTS_VOICES)
 DEFAULT_VOICE = "Roy / 闽南-阿杰"
 
-SUPPORTS_LANGUAGES = 	["Auto / 自动",
+SUPPORTS_LANGUAGES: Tuple[str, ...] = 	("Auto / 自动",
 					"English / 英文",
 					"Chinese / 中文",
 					"German / 德语",
@@ -45,54 +78,147 @@ SUPPORTS_LANGUAGES = 	["Auto / 自动",
 					"Japanese / 日语",
 					"Korean / 韩语",
 					"French / 法语",
-					"Russian / 俄语"]
+					"Russian / 俄语")
+_LANGUAGES_SET = frozenset(SUPPORTS_LANGUAGES)
 DEFAULT_LANGUAGE = "Auto / 自动"
 
 DEFAULT_FN_INDEX = 1
 DEFAULT_TRIGGER_ID = 7
 DEFAULT_TIMEOUT_JOIN = 30
 DEFAULT_TIMEOUT_TTS = 60 # 增加 TTS 过程的整体超时，避免长时间等待
+DEFAULT_CONFIG_TTL = 60 # /config 在 Space 生命周期内基本静态，短 TTL 缓存即可
+DEFAULT_TTS_CACHE_SIZE = 128
+DEFAULT_TTS_CACHE_TTL = 1800 # HF Space 的文件 URL 会过期，缓存不宜超过 30 分钟
+
+# _join_queue 对瞬时故障（连接失败/超时/5xx，常见于 Space 冷启动）的重试参数
+DEFAULT_JOIN_RETRIES = 3
+_RETRY_STATUS_CODES = (502, 503, 504)
+_RETRY_BACKOFF_BASE = 0.5 # 首次重试前的基础等待（秒），之后指数增长
+_RETRY_BACKOFF_CAP = 4.0  # 单次等待上限（秒）
+_RETRY_JITTER = 0.3       # 随机抖动幅度（秒），避免多客户端同步重试
 DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                           "(KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36 Edg/142.0.0.0")
 
+# SSE 行分类：事件行里只有 data: 字段携带我们关心的 JSON
+# （event:/id:/retry: 等一律忽略）。模块加载时预计算前缀与长度，
+# 循环内用定长切片比较代替 startswith 的方法调用，每帧都会执行
+_SSE_DATA_PREFIX = b"data:"
+_SSE_PREFIX_LEN = len(_SSE_DATA_PREFIX)
+
 class QwenTTSClient:
     """
     Qwen TTS 客户端类，用于与 Gradio/HuggingFace Space 上的 Qwen3 TTS 服务进行交互
     封装了队列加入 (_join_queue) 和 SSE 流式轮询 (_poll_data) 的逻辑。
     """
 
-    def __init__(self, base_url: str = DEFAULT_BASE_URL):
+    def __init__(self,
+                 base_url: str = DEFAULT_BASE_URL,
+                 warm_up: bool = False,
+                 transport: str = "requests"):
         """
         初始化 QwenTTSClient 客户端
 
         Args:
             base_url (str): TTS 服务的基础 URL 地址
+            warm_up (bool): 为 True 时在初始化阶段预先发送一次 HEAD 请求，
+                提前完成 TCP/TLS 握手，使首次 tts() 调用省去握手耗时
+            transport (str): "requests"（默认，HTTP/1.1）或 "httpx"
+                （HTTP/2 多路复用，SSE 等待期间下载可共用同一连接，
+                需要安装 httpx[http2]）
         """
+        if transport not in ("requests", "httpx"):
+            raise ValueError(f"无效的 transport: {transport!r}，应为 'requests' 或 'httpx'")
+        self._transport = transport
+
         # 移除基础 URL 末尾的斜杠并保存
         self.base_url = base_url.rstrip('/')
-        # 创建一个 requests 会话对象用于 HTTP 请求
-        self.session = requests.Session()
-        # 更新会话的请求头，设置用户代理信息和默认接受类型
-        self.session.headers.update({
-            "User-Agent": DEFAULT_USER_AGENT,
-            # Gradio API 推荐设置
-            "Accept": "*/*"
-        })
+
+        if transport == "httpx":
+            if httpx is None:
+                raise ImportError(
+                    "transport='httpx' 需要安装 httpx：pip install 'httpx[http2]'")
+            self.session = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=32,
+                    max_connections=64
+                ),
+                headers={
+                    "User-Agent": DEFAULT_USER_AGENT,
+                    "Accept": "*/*"
+                }
+            )
+        else:
+            # 创建一个 requests 会话对象用于 HTTP 请求
+            self.session = requests.Session()
+            # 更新会话的请求头，设置用户代理信息和默认接受类型
+            self.session.headers.update({
+                "User-Agent": DEFAULT_USER_AGENT,
+                # Gradio API 推荐设置
+                "Accept": "*/*",
+                # 显式保持长连接，复用同一条 TLS/TCP 会话
+                "Connection": "keep-alive"
+            })
+            # 挂载调优后的连接池适配器：
+            # 扩大连接池避免批量调用时端口/握手开销，并对 GET 的瞬时 5xx 自动重试
+            # （POST /queue/join 的重试由 _join_queue 自带抖动的退避循环负责，
+            # 两层同时重试会使尝试次数相乘）
+            adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=64,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=_RETRY_STATUS_CODES,
+                    allowed_methods=frozenset(["GET"])
+                )
+            )
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+        # get_config() 的 TTL 缓存：(获取时刻 monotonic, 配置 dict)
+        self._config_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._config_ttl = DEFAULT_CONFIG_TTL
+        # tts() 结果缓存：内容哈希 -> (获取时刻 monotonic, 音频 URL)，LRU 淘汰
+        self._tts_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._tts_cache_size = DEFAULT_TTS_CACHE_SIZE
+        self._tts_cache_ttl = DEFAULT_TTS_CACHE_TTL
+
+        if warm_up:
+            # 预热连接：失败不影响客户端可用性，仅损失预热收益
+            try:
+                self.session.head(self.base_url, timeout=5)
+            except (requests.exceptions.RequestException,) + _HTTPX_ERRORS as e:
+                logger.debug("连接预热失败（可忽略）: %s", e)
+
+    def _request_timeout(self, connect: float, read: float) -> Any:
+        """
+        按当前传输层构造超时对象：requests 用 (connect, read) 元组，
+        httpx 用 httpx.Timeout
+        """
+        if self._transport == "httpx":
+            return httpx.Timeout(read, connect=connect)
+        return (connect, read)
 
     @staticmethod
     def _generate_session_hash(length: int = 9) -> str:
         """
         生成指定长度的随机会话哈希字符串
+
+        使用 `secrets` 的系统级随机源，避免 `random` 在多进程/相同种子下
+        产生可预测甚至碰撞的会话哈希（哈希碰撞会导致两个客户端互收事件）。
         """
-        characters = string.ascii_lowercase + string.digits
-        return ''.join(random.choices(characters, k=length))
+        # token_hex(n) 返回 2n 个十六进制字符，截断到所需长度
+        return secrets.token_hex((length + 1) // 2)[:length]
 
     def _join_queue(self,
                     text: str,
                     voice: str = DEFAULT_VOICE,
                     mode: str = DEFAULT_LANGUAGE,
                     fn_index: int = DEFAULT_FN_INDEX,
-                    trigger_id: int = DEFAULT_TRIGGER_ID) -> Dict[str, Any]:
+                    trigger_id: int = DEFAULT_TRIGGER_ID,
+                    session_hash: Optional[str] = None,
+                    timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         通过向 /gradio_api/queue/join 发送 POST 请求加入 TTS 生成队列
 
@@ -100,8 +226,19 @@ class QwenTTSClient:
         1. 细化了异常捕获。
         2. 使用 `DEFAULT_TIMEOUT_JOIN` 常量。
         3. 明确返回结果中包含 `session_hash`。
+        4. 可传入外部生成的 `session_hash`，供 `tts_batch` 在同一 SSE
+           流上复用会话。
+        5. `timeout` 约束整个加入阶段（含重试等待）的墙钟时间，
+           供 `tts()` 把总预算按剩余量分摊到各阶段。
         """
-        session_hash = self._generate_session_hash()
+        # O(1) 本地校验，避免把非法参数发给服务端再等它报错
+        if voice not in _VOICES_SET:
+            raise ValueError(f"不支持的语音选项: {voice!r}，可选值见 voices()")
+        if mode not in _LANGUAGES_SET:
+            raise ValueError(f"不支持的语言选项: {mode!r}，可选值见 languages()")
+
+        if session_hash is None:
+            session_hash = self._generate_session_hash()
         url = f"{self.base_url}/gradio_api/queue/join" # URL 中无需问号
 
         # 优化：明确定义请求载荷结构
@@ -115,95 +252,347 @@ class QwenTTSClient:
 
         headers = {"Content-Type": "application/json"}
 
-        logger.info(f"正在加入 TTS 队列，处理文本: {text[:20]}...")
-
-        try:
-            response = self.session.post(
-                url,
-                headers=headers,
-                json=payload,
-                # 连接超时 5s，读取超时使用常量
-                timeout=(5, DEFAULT_TIMEOUT_JOIN)
-            )
-            response.raise_for_status() # 检查 HTTP 状态码
-        except requests.exceptions.Timeout as e:
-            logger.error(f"加入队列请求超时: {e}")
-            raise requests.exceptions.Timeout("加入队列请求超时") from e
-        except requests.exceptions.RequestException as e:
-            logger.error(f"加入队列请求失败: {e}")
-            raise requests.exceptions.RequestException(f"加入队列请求失败: {response.text}") from e
-
-        result = response.json()
+        logger.info("正在加入 TTS 队列，处理文本: %s...", text[:20])
+
+        # 预先序列化为 UTF-8 字节，跳过 requests 内部的 json.dumps(ensure_ascii=True)
+        body = _json_dumps(payload)
+        # 连接超时 5s，读取超时默认使用常量
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT_JOIN
+        # 整个加入阶段（含重试等待）的截止时刻
+        join_deadline = time.monotonic() + timeout
+        request_timeout = self._request_timeout(5, timeout)
+
+        # 瞬时故障（连接失败/超时/5xx）按指数退避 + 随机抖动重试；
+        # 其他错误（如 4xx）立即抛出
+        last_error: Optional[Exception] = None
+        attempt = 0
+        while True:
+            try:
+                if self._transport == "httpx":
+                    response = self.session.post(
+                        url, headers=headers, content=body, timeout=request_timeout)
+                else:
+                    response = self.session.post(
+                        url, headers=headers, data=body, timeout=request_timeout)
+                response.raise_for_status() # 检查 HTTP 状态码
+                break
+            except (requests.exceptions.Timeout,
+                    requests.exceptions.ConnectionError) as e:
+                last_error = e
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code in _RETRY_STATUS_CODES:
+                    last_error = e
+                else:
+                    logger.error("加入队列请求失败: %s", e)
+                    raise requests.exceptions.RequestException(f"加入队列请求失败: {e}") from e
+            except requests.exceptions.RequestException as e:
+                logger.error("加入队列请求失败: %s", e)
+                raise
+            except _HTTPX_ERRORS as e:
+                status_error = httpx is not None and isinstance(e, httpx.HTTPStatusError)
+                if status_error and e.response.status_code not in _RETRY_STATUS_CODES:
+                    logger.error("加入队列请求失败: %s", e)
+                    raise
+                last_error = e
+
+            attempt += 1
+            delay = min(_RETRY_BACKOFF_CAP,
+                        _RETRY_BACKOFF_BASE * 2 ** (attempt - 1))
+            delay += random.uniform(0, _RETRY_JITTER)
+            # 重试次数耗尽或剩余时间不足以再等一轮时，保持原有异常语义向上抛出
+            if attempt > DEFAULT_JOIN_RETRIES or time.monotonic() + delay > join_deadline:
+                logger.error("加入队列重试 %d 次后仍失败: %s", attempt - 1, last_error)
+                if isinstance(last_error, requests.exceptions.Timeout):
+                    raise requests.exceptions.Timeout("加入队列请求超时") from last_error
+                raise last_error
+            logger.info("加入队列第 %d 次重试，等待 %.2fs: %s", attempt, delay, last_error)
+            time.sleep(delay)
+
+        result = _json_loads(response.content)
         result["session_hash"] = session_hash # 确保返回结果包含 session_hash
 
-        logger.info(f"成功加入 TTS 队列，Hash: {session_hash}")
+        logger.info("成功加入 TTS 队列，Hash: %s", session_hash)
         return result
 
     def _poll_data(self,
                     session_hash: str,
-                    timeout: int = DEFAULT_TIMEOUT_TTS) -> Generator[Dict[str, Any], None, None]:
+                    timeout: float = DEFAULT_TIMEOUT_TTS) -> Generator[Dict[str, Any], None, None]:
         """
         通过连接到 /gradio_api/queue/data 并使用 SSE 流式传输轮询 TTS 结果
 
         优化说明:
         1. 移除 `Optional[int]`，明确 `timeout` 为 int 类型。
         2. 统一使用 `timeout` 参数控制读取超时。
-        3. 使用 `yield from` 结构，简化 SSEClient 的循环。
+        3. 直接按字节行解析 SSE 流：我们只关心 `data:` 行中的 JSON，
+           跳过 SSEClient 的逐事件 Event 对象构建，降低每帧的 CPU 与分配开销。
+        4. 连接建立是立即执行的（非生成器延迟触发），返回前 GET 已发出，
+           tts() 可借此把建连与加入队列的 POST 并行化。
+        """
+        response = self._open_poll_stream(session_hash, timeout)
+        return self._stream_poll_events(response)
+
+    def _open_poll_stream(self, session_hash: str, timeout: float) -> Any:
+        """
+        立即向 /gradio_api/queue/data 发起流式 GET 并返回已建连的响应对象
         """
         url = f"{self.base_url}/gradio_api/queue/data?session_hash={session_hash}"
         headers = {"Accept": "text/event-stream"}
+        request_timeout = self._request_timeout(5, timeout)
 
-        logger.info(f"开始轮询数据，会话哈希: {session_hash}")
+        logger.info("开始轮询数据，会话哈希: %s", session_hash)
 
         try:
-            # 使用 `with` 语句确保连接关闭
-            with self.session.get(url, headers=headers, stream=True, timeout=(5, timeout)) as response:
+            if self._transport == "httpx":
+                request = self.session.build_request(
+                    "GET", url, headers=headers, timeout=request_timeout)
+                response = self.session.send(request, stream=True)
+            else:
+                response = self.session.get(url, headers=headers, stream=True,
+                                            timeout=request_timeout)
+            try:
                 response.raise_for_status()
+            except Exception:
+                response.close()
+                raise
+        except requests.exceptions.RequestException as e:
+            logger.error("轮询数据请求失败: %s", e)
+            raise requests.exceptions.RequestException(f"轮询数据请求失败") from e
+        except _HTTPX_ERRORS as e:
+            logger.error("轮询数据请求失败: %s", e)
+            raise
+        return response
 
-                client = SSEClient(response)
-                # 使用 while True 结构来确保在生成器结束后关闭 client 是困难的
-                # 因此保持原有的 try/finally 结构，但简化事件处理
-                for event in client.events():
-                    try:
-                        # 尝试将事件数据解析为 JSON
-                        parsed = json.loads(event.data)
-                        yield parsed
-                    except json.JSONDecodeError as e:
-                        # 如果 JSON 解析失败，记录警告日志并产出原始数据
-                        logger.warning(f"JSON 解析失败: {e}, 原始数据: {event.data[:50]}...")
-                        yield {"raw": event.data, "error": str(e)}
-                    except Exception as e:
-                         # 其他异常
-                         logger.error(f"处理 SSE 事件时发生未知错误: {e}")
-                         yield {"raw": event.data, "error": str(e)}
-
+    def _stream_poll_events(self, response: Any) -> Generator[Dict[str, Any], None, None]:
+        """
+        消费已建连的流式响应并产出事件，结束（含提前 close）时关闭连接
+        """
+        try:
+            if self._transport == "httpx":
+                # httpx 的 iter_lines 产出 str，统一编码回 bytes 复用解析逻辑
+                yield from self._parse_sse_stream(
+                    line.encode("utf-8") for line in response.iter_lines())
+            else:
+                # 保持 bytes 不做 unicode 解码，json.loads 可直接处理 bytes
+                yield from self._parse_sse_stream(
+                    response.iter_lines(chunk_size=16384, decode_unicode=False))
         except requests.exceptions.RequestException as e:
-            logger.error(f"轮询数据请求失败: {e}")
+            logger.error("轮询数据请求失败: %s", e)
             raise requests.exceptions.RequestException(f"轮询数据请求失败") from e
+        except _HTTPX_ERRORS as e:
+            logger.error("轮询数据请求失败: %s", e)
+            raise
+        finally:
+            response.close()
+
+    @staticmethod
+    def _parse_sse_stream(lines) -> Generator[Dict[str, Any], None, None]:
+        """
+        将 SSE 字节行流解析为事件 dict 流（与传输层无关）
+
+        解析失败的帧只计数，流结束时汇总输出一条 WARNING；
+        逐帧详情仅在 DEBUG 级别开启时格式化，避免热路径上的字符串开销。
+        """
+        parse_errors = 0
+        try:
+            for raw in lines:
+                # 空行（事件分隔符）与非 data 字段直接跳过
+                if raw[:_SSE_PREFIX_LEN] != _SSE_DATA_PREFIX:
+                    continue
+                data = raw[_SSE_PREFIX_LEN:].lstrip()
+                try:
+                    # 尝试将事件数据解析为 JSON（全程保持 bytes，不做二次 UTF-8 解码）
+                    event = _json_loads(data)
+                except ValueError as e:
+                    # 同时覆盖 json.JSONDecodeError 与 orjson.JSONDecodeError
+                    parse_errors += 1
+                    raw_text = data.decode("utf-8", errors="replace")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("JSON 解析失败: %s, 原始数据: %s...", e, raw_text[:50])
+                    yield {"raw": raw_text, "error": str(e)}
+                    continue
+
+                yield event
+                # close_stream 是 Gradio 的终止帧：立即退出循环，
+                # 使上层 with 块马上关闭响应并释放 socket，而不是阻塞在
+                # 下一次读取上等服务端断开
+                if event.get("msg") == "close_stream":
+                    break
+        finally:
+            if parse_errors:
+                logger.warning("SSE 流中共有 %d 条事件 JSON 解析失败", parse_errors)
+
+    def _poll_data_longpoll(self,
+                            session_hash: str,
+                            timeout: float = DEFAULT_TIMEOUT_TTS,
+                            interval: float = 1.0) -> Generator[Dict[str, Any], None, None]:
+        """
+        `_poll_data` 的长轮询替代实现：周期性 GET /gradio_api/queue/data
+        并直接解析 JSON 响应，不保持流式连接。
+
+        适用于中间代理会缓冲 SSE 的环境（最终事件可能被延迟数秒送达），
+        等待期间也不会占用连接池中的 socket。两次请求之间按指数退避休眠，
+        上限为 `interval * 4`。
+        """
+        url = f"{self.base_url}/gradio_api/queue/data?session_hash={session_hash}"
+        headers = {"Accept": "application/json"}
+
+        logger.info("开始长轮询数据，会话哈希: %s", session_hash)
+
+        deadline = time.monotonic() + timeout
+        delay = interval
+        while time.monotonic() < deadline:
+            try:
+                response = self.session.get(
+                    url, headers=headers, timeout=self._request_timeout(5, interval * 3))
+                response.raise_for_status()
+                payload = _json_loads(response.content)
+            except ValueError:
+                # 响应暂不是合法 JSON（例如队列尚未就绪），退避后重试
+                time.sleep(delay)
+                delay = min(delay * 2, interval * 4)
+                continue
+            except requests.exceptions.RequestException as e:
+                logger.error("长轮询数据请求失败: %s", e)
+                raise requests.exceptions.RequestException("轮询数据请求失败") from e
+            except _HTTPX_ERRORS as e:
+                logger.error("长轮询数据请求失败: %s", e)
+                raise
+
+            # 响应可能是单个事件或事件列表，统一逐个产出
+            for event in payload if isinstance(payload, list) else [payload]:
+                yield event
+                if event.get("msg") == "process_completed":
+                    return
+
+            time.sleep(delay)
+            delay = min(delay * 2, interval * 4)
+
+        logger.warning("长轮询超时 (%ss)，会话哈希: %s", timeout, session_hash)
 
-    # get_config 方法保持不变，它很简单且功能清晰。
     def get_config(self) -> Dict[str, Any]:
         """
         通过 GET /config 获取服务配置信息
+
+        结果按 `DEFAULT_CONFIG_TTL` 秒做内存缓存：Gradio 的 /config 在
+        Space 存续期间基本不变，窗口内的重复调用直接返回缓存，
+        省去一次完整的 HTTPS 往返。需要强制刷新时调用 `refresh_config()`。
         """
+        now = time.monotonic()
+        if self._config_cache is not None:
+            cached_at, cached_config = self._config_cache
+            if now - cached_at < self._config_ttl:
+                return cached_config
+
         url = f"{self.base_url}/config"
         response = self.session.get(url, timeout=10)
         response.raise_for_status()
-        return response.json()
+        result = response.json()
+        self._config_cache = (now, result)
+        return result
+
+    def refresh_config(self) -> Dict[str, Any]:
+        """
+        使配置缓存失效并重新拉取（例如 Space 重启后调用）
+        """
+        self._config_cache = None
+        return self.get_config()
 
     # 获取支持的语音列表
-    def voices(self) -> Dict[str, Any]:
+    def voices(self) -> Tuple[str, ...]:
         return SUPPORTS_VOICES
 
     # 获取支持的语言列表
-    def languages(self) -> Dict[str, Any]:
+    def languages(self) -> Tuple[str, ...]:
         return SUPPORTS_LANGUAGES
 
+    @staticmethod
+    def _extract_audio_url(event: Dict[str, Any]) -> Optional[str]:
+        """
+        从 process_completed 事件中提取音频 URL
+
+        事件形状已知时直接按键取值走快路径；形状不符（缺键/空列表/类型不对）
+        统一返回 None，避免链式 .get 每帧分配临时的 {} / [] 默认值。
+        """
+        try:
+            return event["output"]["data"][0]["url"]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    @staticmethod
+    def _tts_cache_key(text: str, voice: str, mode: str) -> str:
+        """
+        计算 (voice, mode, text) 的内容哈希作为缓存键
+        """
+        return hashlib.blake2b(
+            f"{voice}|{mode}|{text}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def _tts_cache_get(self, key: str) -> Optional[str]:
+        """
+        查询 tts 结果缓存，命中则刷新 LRU 顺序；过期条目就地删除
+        """
+        entry = self._tts_cache.get(key)
+        if entry is None:
+            return None
+        cached_at, url = entry
+        if time.monotonic() - cached_at > self._tts_cache_ttl:
+            del self._tts_cache[key]
+            return None
+        self._tts_cache.move_to_end(key)
+        return url
+
+    def _tts_cache_put(self, key: str, url: str) -> None:
+        """
+        写入 tts 结果缓存，超出容量时淘汰最久未使用的条目
+        """
+        self._tts_cache[key] = (time.monotonic(), url)
+        self._tts_cache.move_to_end(key)
+        while len(self._tts_cache) > self._tts_cache_size:
+            self._tts_cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """
+        清空 tts 结果缓存
+        """
+        self._tts_cache.clear()
+
+    def download(self, url: str, path: str, chunk_size: int = 65536) -> str:
+        """
+        流式下载音频文件到磁盘
+
+        分块写入而非一次性缓冲整个文件，多 MB 的 WAV 不会占用等量内存。
+
+        Args:
+            url (str): 音频文件 URL
+            path (str): 保存路径
+            chunk_size (int): 每次读取的字节数
+
+        Returns:
+            str: 保存路径
+        """
+        request_timeout = self._request_timeout(5, DEFAULT_TIMEOUT_TTS)
+        if self._transport == "httpx":
+            with self.session.stream("GET", url, timeout=request_timeout) as response:
+                response.raise_for_status()
+                with open(path, "wb") as f:
+                    for chunk in response.iter_bytes(chunk_size):
+                        f.write(chunk)
+        else:
+            with self.session.get(url, stream=True, timeout=request_timeout) as response:
+                response.raise_for_status()
+                with open(path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk)
+        return path
+
     def tts(self,
             text: str,
             voice: str = DEFAULT_VOICE,
             mode: str = DEFAULT_LANGUAGE,
-            timeout: int = DEFAULT_TIMEOUT_TTS) -> Optional[str]:
+            timeout: int = DEFAULT_TIMEOUT_TTS,
+            download_to: Optional[str] = None,
+            poll_mode: str = "sse") -> Optional[str]:
         """
         高级方法，合成文本并直接返回音频文件 URL
 
@@ -211,53 +600,121 @@ class QwenTTSClient:
         1. 重用 `_poll_data` 方法的逻辑，避免代码重复（原代码中 tts 内部重复了轮询逻辑）。
         2. 增加了对 Gradio 队列状态的日志记录。
         3. 统一处理异常，只返回 URL 或 None。
+        4. 拿到 URL 后通过 finally 显式关闭生成器，立即释放 SSE 连接回连接池，
+           而不是等待垃圾回收。
+        5. 指定 `download_to` 时，URL 一出现就在后台线程启动流式下载，
+           与 SSE 连接的收尾重叠，节省约一次下载耗时的等待。
+
+        Args:
+            text (str): 待合成的文本
+            voice (str): 语音选项
+            mode (str): 合成模式（语言）
+            timeout (int): 整次调用（加入队列 + 轮询）共享的墙钟超时（秒）
+            download_to (Optional[str]): 保存路径；为 None 时仅返回 URL 不下载
+            poll_mode (str): "sse"（默认，流式）或 "longpoll"（周期轮询，
+                适用于代理缓冲 SSE 的网络环境）
         """
+        if poll_mode not in ("sse", "longpoll"):
+            raise ValueError(f"无效的 poll_mode: {poll_mode!r}，应为 'sse' 或 'longpoll'")
+
         start_time = time.time()
+        events = None
+        download_future = None
+
+        # 相同 (text, voice, mode) 在 TTL 内直接复用上次的 URL，
+        # 省去完整的队列等待与合成耗时
+        cache_key = self._tts_cache_key(text, voice, mode)
+        cached_url = self._tts_cache_get(cache_key)
+        if cached_url:
+            logger.info("命中 TTS 结果缓存: %s", cache_key)
+            if download_to:
+                try:
+                    self.download(cached_url, download_to)
+                except (requests.exceptions.RequestException,) + _HTTPX_ERRORS as e:
+                    logger.error("音频下载失败: %s", e)
+            return cached_url
+
+        # timeout 是 join+poll 两个阶段共享的总墙钟预算：
+        # 先计算统一截止时刻，各阶段只分得剩余时间，调用方要求 30s 就是 30s
+        deadline = time.monotonic() + timeout
+
+        # session_hash 在本地生成（它由我们发送的载荷定义，无需等服务端返回），
+        # 因此加入队列的 POST 与 SSE 建连可以并行发起，省掉一次串行往返
+        session_hash = self._generate_session_hash()
+        join_timeout = max(1.0, deadline - time.monotonic())
+        poll_timeout = max(1.0, deadline - time.monotonic())
 
         try:
-            # 1. 加入队列
-            join_response = self._join_queue(text, voice, mode)
-            session_hash = join_response.get("session_hash")
-
-            if not session_hash:
-                raise ValueError("从加入队列响应中获取会话哈希失败")
-
-            # 2. 轮询结果
-            for event in self._poll_data(session_hash, timeout):
-                if time.time() - start_time > timeout:
-                    logger.warning(f"TTS 合成超时 ({timeout}s)")
+            if poll_mode == "longpoll":
+                # 长轮询无常驻连接可预热，保持串行
+                self._join_queue(text, voice, mode,
+                                 session_hash=session_hash, timeout=join_timeout)
+                events = self._poll_data_longpoll(
+                    session_hash, max(1.0, deadline - time.monotonic()))
+            else:
+                # 两个请求走同一连接池：POST 在途期间即可完成 SSE 的 GET 建连，
+                # 服务端会让 data 连接等待 join 生效（通常仅数十毫秒）
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    join_future = pool.submit(
+                        self._join_queue, text, voice, mode,
+                        session_hash=session_hash, timeout=join_timeout)
+                    # 并行任务只负责建连并返回响应对象；包装成事件生成器
+                    # 推迟到 join 成功之后，确保失败路径能直接关闭响应
+                    # （对未启动的生成器调用 close() 不会执行到内部的 finally）
+                    poll_future = pool.submit(
+                        self._open_poll_stream, session_hash, poll_timeout)
+                    try:
+                        join_future.result() # 传播加入队列阶段的异常
+                    except Exception:
+                        # join 失败时直接关闭已建连的响应，立即回收 SSE socket
+                        try:
+                            poll_future.result(timeout=5).close()
+                        except Exception:
+                            pass
+                        raise
+                    events = self._stream_poll_events(poll_future.result())
+            for event in events:
+                if time.monotonic() > deadline:
+                    logger.warning("TTS 合成超时 (%ss)", timeout)
                     return None
 
                 msg = event.get("msg")
 
                 # 记录队列状态，方便调试
                 if msg in ["send_hash", "queue_full", "estimation"]:
-                    logger.info(f"队列状态: {msg} - {event.get('rank', '')}")
+                    # 每帧都会命中的日志，先判级别再格式化参数
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("队列状态: %s - %s", msg, event.get("rank", ""))
                 elif msg == "process_completed":
                     # 检查是否完成且成功
                     if event.get("success"):
-                        output_data = event.get("output", {}).get("data", [])
-                        if output_data and len(output_data) > 0:
-                            # 假设音频信息在第一个元素中
-                            audio_info = output_data[0]
-                            audio_url = audio_info.get("url")
-                            if audio_url:
-                                logger.info(f"TTS 合成成功，耗时: {time.time() - start_time:.2f}s")
-                                return f"{audio_url}" # 补充完整 URL
+                        # 音频信息在 output.data 的第一个元素中
+                        audio_url = self._extract_audio_url(event)
+                        if audio_url:
+                            self._tts_cache_put(cache_key, audio_url)
+                            if download_to:
+                                # 立刻在后台线程开始下载，与下方 finally 中的
+                                # SSE 连接关闭并行进行
+                                executor = ThreadPoolExecutor(max_workers=1)
+                                download_future = executor.submit(
+                                    self.download, audio_url, download_to)
+                                executor.shutdown(wait=False)
+                            logger.info("TTS 合成成功，耗时: %.2fs", time.time() - start_time)
+                            return f"{audio_url}" # 补充完整 URL
 
                         logger.warning("成功消息中未找到有效的音频 URL。")
                         return None
                     else:
-                        logger.error(f"TTS 进程执行失败: {event.get('output')}")
+                        logger.error("TTS 进程执行失败: %s", event.get("output"))
                         return None
 
-        except requests.exceptions.RequestException as e:
-            # 捕获所有 requests 相关的异常（超时、HTTP 错误等）
-            logger.error(f"TTS 请求发生网络错误: {e}")
+        except (requests.exceptions.RequestException,) + _HTTPX_ERRORS as e:
+            # 捕获所有传输层相关的异常（超时、HTTP 错误等）
+            logger.error("TTS 请求发生网络错误: %s", e)
             return None
         except ValueError as e:
             # 捕获自定义的 ValueError（如获取 hash 失败）
-            logger.error(f"TTS 逻辑错误: {e}")
+            logger.error("TTS 逻辑错误: %s", e)
             return None
         except KeyboardInterrupt:
             # 处理用户中断操作 (Ctrl+C)
@@ -265,17 +722,120 @@ class QwenTTSClient:
             return None
         except Exception as e:
             # 捕获所有其他意外错误
-            logger.error(f"文本转语音转换过程中发生未知错误: {e}", exc_info=True)
+            logger.error("文本转语音转换过程中发生未知错误: %s", e, exc_info=True)
             return None
+        finally:
+            # 提前返回时关闭生成器，触发 _poll_data 内的 with 退出并断开 SSE 连接
+            if events is not None:
+                events.close()
+            # 等待后台下载落盘后再返回（下载已与连接收尾重叠执行）
+            if download_future is not None:
+                try:
+                    download_future.result()
+                except Exception as e:
+                    logger.error("音频下载失败: %s", e)
 
         # 正常退出循环（例如，轮询流结束）但未找到结果
         logger.warning("轮询流异常结束或未在事件中找到音频 URL")
         return None
 
+    def tts_batch(self,
+                  texts: List[str],
+                  voice: str = DEFAULT_VOICE,
+                  mode: str = DEFAULT_LANGUAGE,
+                  timeout: int = DEFAULT_TIMEOUT_TTS) -> List[Optional[str]]:
+        """
+        在同一个会话上批量合成多段文本，返回与输入顺序一致的音频 URL 列表
+
+        所有任务共用一个 `session_hash`：连续 POST N 次 /queue/join 后，
+        只打开一条 SSE 连接接收全部 `process_completed` 事件 —— N 个任务
+        只需 1 个 TLS 会话与 1 个流式 socket，总耗时趋近最慢任务而非各任务之和。
+
+        Args:
+            texts (List[str]): 待合成的文本列表
+            voice (str): 语音选项
+            mode (str): 合成模式（语言）
+            timeout (int): 整批任务的轮询超时时间（秒）
+
+        Returns:
+            List[Optional[str]]: 每段文本对应的音频 URL（失败项为 None）
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        session_hash = self._generate_session_hash()
+        # event_id -> 文本下标；部分 Gradio 版本的 join 响应不含 event_id，
+        # 此时按加入顺序（order）回退匹配
+        pending: Dict[str, int] = {}
+        order: List[int] = []
+
+        start_time = time.time()
+
+        # 1. 逐条加入队列（缓存命中的文本直接跳过）
+        for idx, text in enumerate(texts):
+            cache_key = self._tts_cache_key(text, voice, mode)
+            cached_url = self._tts_cache_get(cache_key)
+            if cached_url:
+                results[idx] = cached_url
+                continue
+            try:
+                join_response = self._join_queue(
+                    text, voice, mode, session_hash=session_hash)
+            except (requests.exceptions.RequestException,) + _HTTPX_ERRORS as e:
+                logger.error("第 %d 条文本加入队列失败: %s", idx, e)
+                continue
+            event_id = join_response.get("event_id")
+            if event_id:
+                pending[event_id] = idx
+            order.append(idx)
+
+        if not order:
+            return results
+
+        # 2. 在单条 SSE 流上收集所有完成事件
+        remaining = len(order)
+        events = self._poll_data(session_hash, timeout)
+        try:
+            for event in events:
+                if time.time() - start_time > timeout:
+                    logger.warning("批量 TTS 合成超时 (%ss)，剩余 %d 项未完成", timeout, remaining)
+                    break
+
+                if event.get("msg") != "process_completed":
+                    continue
+
+                event_id = event.get("event_id")
+                idx = pending.pop(event_id, None) if event_id else None
+                if idx is None:
+                    # 回退：按加入顺序匹配第一个未完成的任务
+                    while order and results[order[0]] is not None:
+                        order.pop(0)
+                    if not order:
+                        continue
+                    idx = order.pop(0)
+
+                if event.get("success"):
+                    audio_url = self._extract_audio_url(event)
+                    if audio_url:
+                        results[idx] = audio_url
+                        self._tts_cache_put(
+                            self._tts_cache_key(texts[idx], voice, mode),
+                            audio_url)
+                else:
+                    logger.error("第 %d 条文本合成失败: %s", idx, event.get("output"))
+
+                remaining -= 1
+                if remaining == 0:
+                    break
+        except (requests.exceptions.RequestException,) + _HTTPX_ERRORS as e:
+            logger.error("批量 TTS 轮询发生网络错误: %s", e)
+        finally:
+            events.close()
+
+        return results
+
 # --- 示例使用 (保持不变，或用于测试) ---
 if __name__ == '__main__':
-    # 注意：运行此代码需要安装 requests 和 sseclient 库
-    # pip install requests sseclient-py
+    # 注意：运行此代码需要安装 requests 库
+    # pip install requests
 
     client = QwenTTSClient()
     text_to_synthesize = "你好，我是阿里云通义千问模型，我正在为您合成闽南语语音。"
@@ -302,14 +862,9 @@ if __name__ == '__main__':
     if audio_url:
         print(f"✅ 语音合成成功，音频 URL: {audio_url}")
         try:
-          # 发送GET请求获取音频数据
+          # 流式下载音频数据到磁盘（不在内存中缓冲整个文件）
           start_time = time.time()
-          response = requests.get(audio_url)
-          response.raise_for_status()
-          filename = "audio.wav"
-          # 保存音频文件
-          with open(filename, 'wb') as f:
-              f.write(response.content)
+          filename = client.download(audio_url, "audio.wav")
           download_time = time.time() - start_time
           print(f"✅️ 音频已保存到: {filename}，耗时: {download_time:.2f}秒")
 
@@ -26,7 +26,18 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=[
-        "requests>=2.25.0",
-        "sseclient-py>=1.8.0"
+        "requests>=2.25.0"
     ],
+    extras_require={
+        "async": [
+            "aiohttp>=3.8.0",
+            "aiohttp-sse-client>=0.2.0"
+        ],
+        "fast": [
+            "orjson>=3.8.0"
+        ],
+        "http2": [
+            "httpx[http2]>=0.27.0"
+        ],
+    },
 )